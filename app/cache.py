@@ -0,0 +1,71 @@
+import hashlib
+import logging
+from typing import Optional
+
+import orjson
+import redis.asyncio as redis
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Redis client for caching Gemini responses (initialized in app lifespan)
+redis_client: Optional[redis.Redis] = None
+
+cache_stats = {"cache_hit": 0, "cache_miss": 0}
+
+
+async def init_redis():
+    """Create the Redis client if a URL is configured"""
+    global redis_client
+    if not settings.redis_url:
+        logger.info("REDIS_URL not set, Gemini response cache disabled")
+        return
+    try:
+        redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+        await redis_client.ping()
+    except Exception as e:
+        logger.error(f"Redis connection failed, Gemini response cache disabled: {e}")
+        redis_client = None
+
+async def close_redis():
+    """Close the Redis client"""
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
+
+def get_cache_stats() -> dict:
+    """Get Gemini response cache status and hit/miss counters"""
+    return {"enabled": redis_client is not None, **cache_stats}
+
+def prompt_cache_key(prompt: str) -> str:
+    """Build the cache key for a normalized user prompt"""
+    digest = hashlib.blake2b(prompt.strip().lower().encode(), digest_size=16).hexdigest()
+    return "qz:" + digest
+
+async def get_cached_json(key: str) -> Optional[dict]:
+    """Return the cached JSON for key, or None on miss or Redis failure"""
+    if redis_client is None:
+        return None
+    try:
+        cached = await redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Redis get failed for {key}: {e}")
+        return None
+
+    if cached is None:
+        cache_stats["cache_miss"] += 1
+        return None
+
+    cache_stats["cache_hit"] += 1
+    return orjson.loads(cached)
+
+async def set_cached_json(key: str, value: dict, ttl: int):
+    """Store value as JSON under key for ttl seconds"""
+    if redis_client is None:
+        return
+    try:
+        await redis_client.setex(key, ttl, orjson.dumps(value))
+    except Exception as e:
+        logger.warning(f"Redis set failed for {key}: {e}")
@@ -29,6 +29,11 @@ class Settings(BaseSettings):
     # Gemini AI Configuration
     gemini_api_key: SecretStr = os.getenv("GEMINI_API_KEY", "")
 
+    # Redis Configuration (Gemini response cache)
+    redis_url: str = os.getenv("REDIS_URL", "")
+    quiz_cache_ttl: int = int(os.getenv("QUIZ_CACHE_TTL", 3600))
+    non_quiz_cache_ttl: int = int(os.getenv("NON_QUIZ_CACHE_TTL", 3600))
+
     @property
     def DATABASE_URL(self):
         return f"postgresql+psycopg2://{self.user}:{self.password.get_secret_value()}@{self.host}:{self.port}/{self.dbname}?sslmode=require"
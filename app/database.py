@@ -65,6 +65,16 @@ class Database:
             logging.error(f"Insert error in {table}: {e}")
             raise e
     
+    @staticmethod
+    def rpc(function: str, params: dict):
+        """Call a Postgres function through PostgREST"""
+        try:
+            result = supabase_admin.rpc(function, params).execute()
+            return result.data
+        except Exception as e:
+            logging.error(f"RPC error in {function}: {e}")
+            raise e
+    
     @staticmethod
     def select(table: str, columns: str = "*", filters: dict = None, limit: int = None):
         """Select data from table"""
@@ -1,12 +1,25 @@
-from fastapi import FastAPI, Request
+from contextlib import asynccontextmanager
+import orjson
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from app.cache import init_redis, close_redis
 from app.routes import auth, quizzes, sessions, results, users, admin, realtime, chatbot
+from app.routes.quizzes import get_trivia_quizzes
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_redis()
+    yield
+    await close_redis()
 
 app = FastAPI(
     title="Quizzler API", 
     version="1.0.0", 
     description="API for the Quizzler online quiz platform",
     root_path="",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     servers=[
         {"url": "https://quizzler-backend.adityatorgal.me", "description": "Production"},
         {"url": "http://localhost:8000", "description": "Development"}
@@ -43,15 +56,14 @@ app.include_router(admin.router, prefix="/admin", tags=["Admin"])
 app.include_router(realtime.router, prefix="/realtime", tags=["Live Quiz"])
 app.include_router(chatbot.router, prefix="/chatbot", tags=["Chatbot"])
 
-@app.get("/trivia", tags=["Quizzes"])
-async def get_trivia_quizzes_root(topic: str = None, difficulty: str = None, sort_by: str = "popularity"):
-    """Get public trivia quizzes (root level endpoint)"""
-    from app.routes.quizzes import get_trivia_quizzes
-    return await get_trivia_quizzes(topic=topic, difficulty=difficulty, sort_by=sort_by)
+# Root level alias for public trivia quizzes
+app.add_api_route("/trivia", get_trivia_quizzes, methods=["GET"], tags=["Quizzes"])
+
+_ROOT_BYTES = orjson.dumps({"message": "Welcome to Quizzler API", "version": app.version})
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to Quizzler API", "version": app.version}
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
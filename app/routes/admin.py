@@ -4,10 +4,10 @@ from app.utils.auth_utils import require_admin
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 
 router = APIRouter()
-IST = pytz.timezone('Asia/Kolkata')
+IST = ZoneInfo('Asia/Kolkata')
 
 class AddGenre(BaseModel):
     name: str
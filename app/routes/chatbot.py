@@ -1,21 +1,49 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, Field, ValidationError
 from datetime import datetime, timedelta
+import asyncio
 import json
 import re
-from typing import List, Optional
+import orjson
+from typing import List, Literal, Optional
 from uuid import uuid4
-import pytz
+from zoneinfo import ZoneInfo
 from google import genai
 from app.config import settings
+from app.cache import prompt_cache_key, get_cached_json, set_cached_json
 from app.database import db
 from app.utils.auth_utils import get_current_user, is_admin_user
 
-IST = pytz.timezone('Asia/Kolkata')
+IST = ZoneInfo('Asia/Kolkata')
 
 router = APIRouter()
 
 client = genai.Client(api_key=settings.gemini_api_key.get_secret_value())
+GEMINI_MODEL = "gemini-2.0-flash-exp"
+
+_FENCE_RE = re.compile(r"^```(?:json)?|```$", re.IGNORECASE | re.MULTILINE)
+
+# Prompts without any quiz keyword (greetings, small talk) never reach Gemini
+_QUIZ_KEYWORDS = frozenset({
+    "quiz", "quizzes", "question", "questions", "mcq", "mcqs",
+    "test", "tests", "exam", "exams", "trivia"
+})
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Static replies are built once and returned as-is; they are never mutated
+_NON_QUIZ_RESPONSE = {
+    "success": False,
+    "intent": "non_quiz",
+    "message": "I'm a Quiz Creation Bot. I can only help you create quizzes. Please describe the quiz you want to create, for example: 'Create a quiz on Python programming with 10 questions' or 'Make a history quiz about World War 2 with 15 questions, duration 45 minutes'.",
+    "is_quiz_request": False
+}
+
+_UNCLEAR_RESPONSE = {
+    "success": False,
+    "intent": "unclear",
+    "message": "I'm a Quiz Creation Bot. I can only help you create quizzes. Please describe the quiz you want to create, for example: 'Create a quiz on Python programming with 10 questions'.",
+    "is_quiz_request": False
+}
 
 GEMINI_PROMPT = """
 You are a QuizBot integrated into a quiz creation platform.
@@ -90,30 +118,40 @@ Examples of non-quiz requests:
 """
 
 
+# The template only varies by current time, so split it once around that
+# placeholder instead of re-running str.format on every request.
+_PROMPT_HEAD, _PROMPT_TAIL = (
+    part.replace("{{", "{").replace("}}", "}")
+    for part in GEMINI_PROMPT.split("{current_time}", 1)
+)
+_PROMPT_HEAD = "\n        " + _PROMPT_HEAD
+
+_USER_WRAP_PRE = '''
+
+        User's natural language input:
+        "'''
+
+_USER_WRAP_POST = '''"
+
+        Parse this input and generate a complete quiz with questions. Make sure to:
+        1. Extract the topic and create a relevant title and description
+        2. Parse any time-related information (relative times like "10 minutes from now")
+        3. Extract number of questions, duration, marking scheme if mentioned
+        4. Generate high-quality questions relevant to the topic
+        5. Return only valid JSON in the specified format
+        '''
+
+
 class QuizPrompt(BaseModel):
     prompt: str  # Natural language input from user
 
 class QuestionCreate(BaseModel):
-    question_text: str
-    option_a: str
-    option_b: str
-    option_c: str
-    option_d: str
-    correct_option: str  
-    
-    def validate_lengths(self):
-        if len(self.question_text) > 500:
-            raise ValueError("Question text cannot exceed 500 characters")
-        if len(self.option_a) > 200:
-            raise ValueError("Option A cannot exceed 200 characters")
-        if len(self.option_b) > 200:
-            raise ValueError("Option B cannot exceed 200 characters")
-        if len(self.option_c) > 200:
-            raise ValueError("Option C cannot exceed 200 characters")
-        if len(self.option_d) > 200:
-            raise ValueError("Option D cannot exceed 200 characters")
-        if self.correct_option not in ['a', 'b', 'c', 'd']:
-            raise ValueError("Correct option must be 'a', 'b', 'c', or 'd'")
+    question_text: str = Field(max_length=500)
+    option_a: str = Field(max_length=200)
+    option_b: str = Field(max_length=200)
+    option_c: str = Field(max_length=200)
+    option_d: str = Field(max_length=200)
+    correct_option: Literal['a', 'b', 'c', 'd']
 
 class QuizCreate(BaseModel):
     title: str
@@ -130,33 +168,35 @@ class QuizCreate(BaseModel):
     difficulty: Optional[str] = None
     questions: List[QuestionCreate] = []
 
+_GREETING_BYTES = orjson.dumps({
+    "message": "Hello! I'm your QuizBot assistant. I can ONLY help you create quizzes.",
+    "purpose": "I'm designed specifically for quiz creation - not for general conversation.",
+    "instructions": "To create a quiz, describe what kind of quiz you want in plain English!",
+    "input_format": {
+        "prompt": "Your natural language description of the quiz you want to create"
+    },
+    "examples": [
+        "Create a quiz on cars with 10 questions, duration 20 minutes",
+        "I want a Python programming quiz with 15 questions, 45 minutes long",
+        "Generate a history quiz about World War 2, 12 questions",
+        "Make a science quiz on physics, 8 questions, 30 minutes duration",
+        "Create a general knowledge quiz, 20 questions, 2 marks per question"
+    ],
+    "supported_features": [
+        "Any topic or subject",
+        "Custom number of questions (1-20)",
+        "Duration in minutes",
+        "Start time scheduling",
+        "Positive and negative marking"
+    ],
+    "usage": "POST /chatbot/generate with body: { \"prompt\": \"your quiz creation request\" }",
+    "important_note": "⚠️ I will only respond to quiz creation requests. For greetings or general questions, I'll politely redirect you to describe the quiz you want to create."
+})
+
 @router.get("/")
 async def chatbot_greeting(current_user: dict = Depends(get_current_user)):
     """Chatbot greeting and instructions"""
-    return {
-        "message": "Hello! I'm your QuizBot assistant. I can ONLY help you create quizzes.",
-        "purpose": "I'm designed specifically for quiz creation - not for general conversation.",
-        "instructions": "To create a quiz, describe what kind of quiz you want in plain English!",
-        "input_format": {
-            "prompt": "Your natural language description of the quiz you want to create"
-        },
-        "examples": [
-            "Create a quiz on cars with 10 questions, duration 20 minutes",
-            "I want a Python programming quiz with 15 questions, 45 minutes long",
-            "Generate a history quiz about World War 2, 12 questions",
-            "Make a science quiz on physics, 8 questions, 30 minutes duration",
-            "Create a general knowledge quiz, 20 questions, 2 marks per question"
-        ],
-        "supported_features": [
-            "Any topic or subject",
-            "Custom number of questions (1-20)",
-            "Duration in minutes",
-            "Start time scheduling",
-            "Positive and negative marking"
-        ],
-        "usage": "POST /chatbot/generate with body: { \"prompt\": \"your quiz creation request\" }",
-        "important_note": "⚠️ I will only respond to quiz creation requests. For greetings or general questions, I'll politely redirect you to describe the quiz you want to create."
-    }
+    return Response(content=_GREETING_BYTES, media_type="application/json")
 
 def create_quiz_internal(quiz_data: QuizCreate, current_user: dict):
     """Internal function to create a new quiz"""
@@ -167,13 +207,7 @@ def create_quiz_internal(quiz_data: QuizCreate, current_user: dict):
         if len(quiz_data.questions) < 1:
             raise HTTPException(status_code=400, detail="At least 1 question is required")
 
-        for i, question in enumerate(quiz_data.questions):
-            try:
-                question.validate_lengths()
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=f"Question {i+1}: {str(e)}")
-        
-        current_time = datetime.now(IST)
+        now = datetime.now(IST)
         start_time = None
         end_time = None
 
@@ -183,7 +217,7 @@ def create_quiz_internal(quiz_data: QuizCreate, current_user: dict):
                     quiz_data.start_time.replace('Z', '+00:00')
                 ).astimezone(IST)
 
-                if start_dt <= current_time:
+                if start_dt <= now:
                     raise HTTPException(
                         status_code=400,
                         detail="Start time must be in the future for scheduled quizzes"
@@ -202,7 +236,7 @@ def create_quiz_internal(quiz_data: QuizCreate, current_user: dict):
                 ).astimezone(IST)
                 start_dt = end_dt - timedelta(minutes=quiz_data.duration)
 
-                if start_dt <= current_time:
+                if start_dt <= now:
                     raise HTTPException(
                         status_code=400,
                         detail="Quiz duration too long for the specified end time"
@@ -228,26 +262,27 @@ def create_quiz_internal(quiz_data: QuizCreate, current_user: dict):
             "navigation_type": quiz_data.navigation_type,
             "tab_switch_exit": quiz_data.tab_switch_exit,
             "difficulty": None,
-            "popularity": 0,
-            "is_active": True,
-            "created_at": datetime.now(IST).isoformat()
+            "created_at": now.isoformat()
         }
         
-        created_quiz = db.insert("quizzes", quiz)
+        questions_rows = [
+            {
+                "question_text": question_data.question_text,
+                "option_a": question_data.option_a,
+                "option_b": question_data.option_b,
+                "option_c": question_data.option_c,
+                "option_d": question_data.option_d,
+                "correct_option": question_data.correct_option,
+                "mark": quiz_data.positive_mark
+            }
+            for question_data in quiz_data.questions
+        ]
         
-        if quiz_data.questions:
-            for question_data in quiz_data.questions:
-                question = {
-                    "quiz_id": created_quiz["id"],
-                    "question_text": question_data.question_text,
-                    "option_a": question_data.option_a,
-                    "option_b": question_data.option_b,
-                    "option_c": question_data.option_c,
-                    "option_d": question_data.option_d,
-                    "correct_option": question_data.correct_option,
-                    "mark": quiz_data.positive_mark
-                }
-                db.insert("questions", question)
+        # Quiz and questions are written in one transaction server-side
+        created_quiz = db.rpc(
+            "create_quiz_with_questions",
+            {"p_quiz": quiz, "p_questions": questions_rows}
+        )
         
         return {"quiz_id": created_quiz["id"], "title": created_quiz["title"]}
         
@@ -269,20 +304,21 @@ def clean_gemini_json(raw_text: str):
     """
     cleaned = raw_text.strip()
 
-    cleaned = re.sub(r"^```(?:json)?|```$", "", cleaned, flags=re.IGNORECASE | re.MULTILINE).strip()
+    cleaned = _FENCE_RE.sub("", cleaned).strip()
 
     if cleaned.startswith("(") and cleaned.endswith(")"):
         cleaned = cleaned[1:-1].strip()
 
-    match = re.search(r"\{.*\}", cleaned, re.DOTALL)
-    if not match:
+    start = cleaned.find("{")
+    end = cleaned.rfind("}")
+    if start == -1 or end < start:
         raise HTTPException(status_code=400, detail=f"Gemini returned no JSON block.\nOutput:\n{raw_text}")
 
-    cleaned = match.group(0)
+    cleaned = cleaned[start:end + 1]
 
     try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError as e:
+        return orjson.loads(cleaned)
+    except orjson.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Gemini returned invalid JSON: {e}\nCleaned Output:\n{cleaned}")
 
 
@@ -290,53 +326,69 @@ def clean_gemini_json(raw_text: str):
 async def generate_quiz(prompt: QuizPrompt, current_user: dict = Depends(get_current_user)):
     """Generate quiz questions automatically using Gemini AI from natural language input"""
     try:
-        current_ist_time = datetime.now(IST)
-        
-        detailed_prompt = GEMINI_PROMPT.format(current_time=current_ist_time.isoformat())
-        
-        full_prompt = f"""
-        {detailed_prompt}
-        
-        User's natural language input:
-        "{prompt.prompt}"
-        
-        Parse this input and generate a complete quiz with questions. Make sure to:
-        1. Extract the topic and create a relevant title and description
-        2. Parse any time-related information (relative times like "10 minutes from now")
-        3. Extract number of questions, duration, marking scheme if mentioned
-        4. Generate high-quality questions relevant to the topic
-        5. Return only valid JSON in the specified format
-        """
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-exp",
-            contents=full_prompt
-        )
+        tokens = _WORD_RE.findall(prompt.prompt.lower())
+        if _QUIZ_KEYWORDS.isdisjoint(tokens):
+            return _NON_QUIZ_RESPONSE
+
+        cache_key = prompt_cache_key(prompt.prompt)
+        response_json = await get_cached_json(cache_key)
+        from_cache = response_json is not None
+
+        if not from_cache:
+            current_ist_time = datetime.now(IST)
+
+            full_prompt = "".join((
+                _PROMPT_HEAD,
+                current_ist_time.isoformat(),
+                _PROMPT_TAIL,
+                _USER_WRAP_PRE,
+                prompt.prompt,
+                _USER_WRAP_POST
+            ))
+
+            response = await client.aio.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=full_prompt
+            )
 
-        if not response.text:
-            raise HTTPException(status_code=500, detail="Gemini returned empty response")
+            if not response.text:
+                raise HTTPException(status_code=500, detail="Gemini returned empty response")
 
-        response_json = clean_gemini_json(response.text)
+            response_json = clean_gemini_json(response.text)
         
         if response_json.get("intent") == "non_quiz":
-            return {
-                "success": False,
-                "intent": "non_quiz",
-                "message": response_json.get("message", "I'm a Quiz Creation Bot. Please describe the quiz you want to create."),
-                "is_quiz_request": False
-            }
+            # Keyword-bearing prompts Gemini judged off-topic (e.g. "what's on the test?")
+            if not from_cache:
+                await set_cached_json(cache_key, response_json, settings.non_quiz_cache_ttl)
+            message = response_json.get("message")
+            if not message or message == _NON_QUIZ_RESPONSE["message"]:
+                return _NON_QUIZ_RESPONSE
+            return {**_NON_QUIZ_RESPONSE, "message": message}
         
         if response_json.get("intent") == "quiz_creation":
-            quiz_data = {k: v for k, v in response_json.items() if k != "intent"}
+            response_json.pop("intent", None)
+            
+            # Trim before validation so questions past the limit can't fail the request
+            questions = response_json.get("questions")
+            if isinstance(questions, list) and len(questions) > 20:
+                response_json["questions"] = questions[:20]
             
-            quiz_obj = QuizCreate(**quiz_data)
+            quiz_obj = QuizCreate(**response_json)
             
             if len(quiz_obj.questions) < 1:
                 raise HTTPException(status_code=400, detail="Quiz must have at least 1 question")
-            elif len(quiz_obj.questions) > 20:
-                quiz_obj.questions = quiz_obj.questions[:20]
 
-            result = create_quiz_internal(quiz_obj, current_user)
+            # Supabase client is synchronous; keep its round-trips off the event loop
+            result = await asyncio.to_thread(create_quiz_internal, quiz_obj, current_user)
+
+            # Only cache generations that produced a valid quiz. Scheduled quizzes carry
+            # absolute times computed from the request time, so replaying them would be stale.
+            if not from_cache and not (quiz_obj.start_time or quiz_obj.end_time):
+                await set_cached_json(
+                    cache_key,
+                    {"intent": "quiz_creation", **response_json},
+                    settings.quiz_cache_ttl
+                )
             
             return {
                 "success": True,
@@ -350,15 +402,12 @@ async def generate_quiz(prompt: QuizPrompt, current_user: dict = Depends(get_cur
                 "is_quiz_request": True
             }
         else:
-            return {
-                "success": False,
-                "intent": "unclear",
-                "message": "I'm a Quiz Creation Bot. I can only help you create quizzes. Please describe the quiz you want to create, for example: 'Create a quiz on Python programming with 10 questions'.",
-                "is_quiz_request": False
-            }
+            return _UNCLEAR_RESPONSE
 
     except HTTPException:
         raise
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"Generated quiz failed validation: {str(e)}")
     except json.JSONDecodeError as e:
         raise HTTPException(status_code=400, detail=f"Failed to parse AI response as JSON: {str(e)}")
     except Exception as e:
@@ -5,12 +5,12 @@ from uuid import uuid4
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 import csv
 import io
 
 router = APIRouter()
-IST = pytz.timezone('Asia/Kolkata')
+IST = ZoneInfo('Asia/Kolkata')
 
 class QuestionCreate(BaseModel):
     question_text: str
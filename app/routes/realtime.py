@@ -6,6 +6,7 @@ import logging
 from app.utils.websocket_manager import connection_manager
 from app.utils.auth_utils import get_current_user_from_token
 from app.models.realtime import game_storage
+from app.cache import get_cache_stats
 
 router = APIRouter()
 security = HTTPBearer(auto_error=False)
@@ -198,6 +199,7 @@ async def health_check():
         health_data = {
             **health_status,
             "memory_stats": memory_stats,
+            "gemini_cache": get_cache_stats(),
             "timestamp": game_storage.sessions.get("_last_cleanup", 0) if hasattr(game_storage, "sessions") else 0
         }
         
@@ -4,10 +4,10 @@ from app.utils.auth_utils import get_current_user
 from datetime import datetime, timedelta
 from pydantic import BaseModel
 from typing import Dict, Any
-import pytz
+from zoneinfo import ZoneInfo
 
 router = APIRouter()
-IST = pytz.timezone('Asia/Kolkata')
+IST = ZoneInfo('Asia/Kolkata')
 
 class SubmitAnswersRequest(BaseModel):
     answers: Dict[str, str] 
@@ -27,7 +27,7 @@ async def start_quiz(quiz_id: str, current_user: dict = Depends(get_current_user
             if quiz["start_time"]:
                 start_time_naive = datetime.fromisoformat(quiz["start_time"])
                 if start_time_naive.tzinfo is None:
-                    start_time = IST.localize(start_time_naive)
+                    start_time = start_time_naive.replace(tzinfo=IST)
                 else:
                     start_time = start_time_naive.astimezone(IST)
                 if current_time < start_time:
@@ -36,7 +36,7 @@ async def start_quiz(quiz_id: str, current_user: dict = Depends(get_current_user
             if quiz["end_time"]:
                 end_time_naive = datetime.fromisoformat(quiz["end_time"])
                 if end_time_naive.tzinfo is None:
-                    end_time = IST.localize(end_time_naive)
+                    end_time = end_time_naive.replace(tzinfo=IST)
                 else:
                     end_time = end_time_naive.astimezone(IST)
                 if current_time > end_time:
@@ -105,7 +105,7 @@ async def submit_quiz(quiz_id: str, answers_data: SubmitAnswersRequest, current_
         current_time = datetime.now(IST)
         started_at_naive = datetime.fromisoformat(session["started_at"])
         if started_at_naive.tzinfo is None:
-            started_at = IST.localize(started_at_naive)
+            started_at = started_at_naive.replace(tzinfo=IST)
         else:
             started_at = started_at_naive.astimezone(IST)
         max_allowed_time = started_at + timedelta(minutes=quiz["duration"], seconds=30)  
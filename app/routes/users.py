@@ -4,10 +4,10 @@ from app.utils.auth_utils import get_current_user
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 
 router = APIRouter()
-IST = pytz.timezone('Asia/Kolkata')
+IST = ZoneInfo('Asia/Kolkata')
 
 class UpdateProfile(BaseModel):
     name: Optional[str] = None
@@ -1,15 +1,15 @@
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 
 def get_ist_time():
     """Get current time in IST"""
-    ist = pytz.timezone('Asia/Kolkata')
+    ist = ZoneInfo('Asia/Kolkata')
     return datetime.now(ist)
 
 def convert_to_ist(utc_time):
     """Convert UTC time to IST"""
-    ist = pytz.timezone('Asia/Kolkata')
-    return utc_time.replace(tzinfo=pytz.UTC).astimezone(ist)
+    ist = ZoneInfo('Asia/Kolkata')
+    return utc_time.replace(tzinfo=timezone.utc).astimezone(ist)
 
 def format_time_for_display(dt):
     """Format datetime for display"""
@@ -114,3 +114,32 @@ CREATE POLICY "Users can create own responses" ON responses FOR INSERT WITH CHEC
 
 CREATE POLICY "Users can view all ratings" ON ratings FOR SELECT TO authenticated;
 CREATE POLICY "Users can manage own ratings" ON ratings FOR ALL USING (auth.uid() = user_id);
+
+-- Creates a quiz and its questions in a single transaction (called via RPC)
+CREATE OR REPLACE FUNCTION create_quiz_with_questions(p_quiz JSONB, p_questions JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    created quizzes;
+BEGIN
+    INSERT INTO quizzes (
+        id, title, description, creator_id, is_trivia, topic, start_time, end_time,
+        duration, positive_mark, negative_mark, navigation_type, tab_switch_exit,
+        difficulty, created_at
+    )
+    SELECT q.id, q.title, q.description, q.creator_id, q.is_trivia, q.topic, q.start_time, q.end_time,
+           q.duration, q.positive_mark, q.negative_mark, q.navigation_type, q.tab_switch_exit,
+           q.difficulty, COALESCE(q.created_at, NOW())
+    FROM jsonb_populate_record(NULL::quizzes, p_quiz) AS q
+    RETURNING * INTO created;
+
+    INSERT INTO questions (quiz_id, question_text, option_a, option_b, option_c, option_d, correct_option, mark)
+    SELECT created.id, q.question_text, q.option_a, q.option_b, q.option_c, q.option_d, q.correct_option, q.mark
+    FROM jsonb_populate_recordset(NULL::questions, p_questions) AS q;
+
+    RETURN to_jsonb(created);
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION create_quiz_with_questions(JSONB, JSONB) FROM PUBLIC, anon, authenticated;